@@ -0,0 +1,163 @@
+"""
+Chat filter for both relay directions
+
+Blocked words, link patterns and spam signatures are compiled into a single
+Aho-Corasick automaton, so checking a message costs time linear in its length
+no matter how many patterns are configured. The rules file is watched and
+recompiled when it changes, no restart needed.
+
+Rules file format (JSON, every list optional):
+    {
+        "blocked_words": ["badword"],
+        "link_patterns": ["http://", "https://", "discord.gg/"],
+        "spam_signatures": ["free nitro"]
+    }
+
+Matching is case-insensitive. Blocked words only match whole words, link
+patterns and spam signatures match anywhere in the message.
+"""
+
+import os
+import json
+import time
+import logging
+from collections import deque
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Rule categories and whether their patterns must match whole words
+RULE_CATEGORIES = {
+    'blocked_words': True,
+    'link_patterns': False,
+    'spam_signatures': False,
+}
+
+
+class FilterMatch(NamedTuple):
+    category: str
+    pattern: str
+
+
+class PatternMatcher:
+    """Aho-Corasick automaton over a fixed set of (pattern, category, whole_word) rules"""
+
+    def __init__(self, rules: List[Tuple[str, str, bool]]):
+        self.rules = rules
+
+        # State 0 is the root; each state has transitions, a failure link and outputs
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[int]] = [[]]
+
+        for index, (pattern, _, _) in enumerate(rules):
+            self._add(pattern, index)
+        self._link()
+
+    def _add(self, pattern: str, index: int):
+        state = 0
+        for char in pattern:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            state = next_state
+        self.output[state].append(index)
+
+    def _link(self):
+        """Compute failure links breadth-first and merge outputs along them"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def search(self, text: str) -> Optional[FilterMatch]:
+        """Return the first rule matching text, if any"""
+        goto, fail, output = self.goto, self.fail, self.output
+        state = 0
+
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            for index in output[state]:
+                pattern, category, whole_word = self.rules[index]
+                if whole_word and not _is_whole_word(text, position - len(pattern) + 1, position + 1):
+                    continue
+                return FilterMatch(category, pattern)
+
+        return None
+
+
+def _is_whole_word(text: str, start: int, end: int) -> bool:
+    """Check that text[start:end] is not part of a longer word"""
+    if start > 0 and text[start - 1].isalnum():
+        return False
+    if end < len(text) and text[end].isalnum():
+        return False
+    return True
+
+
+class ChatFilter:
+    def __init__(self, path: str, check_interval: float = 5.0):
+        self.path = path
+        self.check_interval = check_interval
+
+        self.matcher = PatternMatcher([])
+        self.loaded_mtime: Optional[float] = None
+        self.last_check = 0.0
+
+        self.reload()
+
+    def reload(self) -> bool:
+        """Recompile the rules file; keeps the previous rules if it is invalid"""
+        try:
+            mtime = os.path.getmtime(self.path)
+            with open(self.path, encoding='utf-8') as f:
+                rules_data = json.load(f)
+
+            rules = []
+            for category, whole_word in RULE_CATEGORIES.items():
+                for pattern in rules_data.get(category, []):
+                    pattern = pattern.strip().casefold()
+                    if pattern:
+                        rules.append((pattern, category, whole_word))
+
+        except (OSError, ValueError, AttributeError, TypeError) as e:
+            logger.error(f"Could not load chat filter rules from {self.path}: {e}")
+            return False
+
+        self.matcher = PatternMatcher(rules)
+        self.loaded_mtime = mtime
+        logger.info(f"Loaded {len(rules)} chat filter patterns from {self.path}")
+        return True
+
+    def _reload_if_changed(self):
+        now = time.monotonic()
+        if now - self.last_check < self.check_interval:
+            return
+        self.last_check = now
+
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+
+        if mtime != self.loaded_mtime:
+            self.reload()
+
+    def check(self, text: str) -> Optional[FilterMatch]:
+        """Return the rule a message violates, or None if it may be relayed"""
+        self._reload_if_changed()
+        return self.matcher.search(text.casefold())
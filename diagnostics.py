@@ -0,0 +1,202 @@
+"""
+Runtime diagnostics for the bot: event-loop lag, handler timings, slow
+callback stack snapshots and an on-demand sampling profiler
+
+Everything except the profiler is only active when enabled. When disabled,
+timed() returns the handler unchanged and no watchdog thread runs, so there
+is no overhead at all.
+
+Loop lag is measured by a watchdog thread that pings the loop every few
+milliseconds with call_soon_threadsafe. A ping that stays unanswered for
+slow_threshold means the loop is blocked, and the thread snapshots the stack
+of whatever is running on it at that moment.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import functools
+import threading
+import traceback
+from collections import Counter, deque
+from typing import Deque, Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class HandlerStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, elapsed: float):
+        self.count += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+
+    @property
+    def average(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class SlowCallback(NamedTuple):
+    timestamp: float
+    source: str
+    duration: float
+    stack: str
+
+
+class Diagnostics:
+    def __init__(self, enabled: bool = False, lag_interval: float = 0.25,
+                 slow_threshold: float = 0.1, history: int = 240):
+        self.enabled = enabled
+        self.lag_interval = lag_interval
+        self.slow_threshold = slow_threshold
+
+        self.lag_samples: Deque[float] = deque(maxlen=history)
+        self.handler_stats: Dict[str, HandlerStats] = {}
+        self.slow_callbacks: Deque[SlowCallback] = deque(maxlen=10)
+
+        # Kept apart from slow handlers so slow sends never push out stack snapshots
+        self.loop_stalls: Deque[SlowCallback] = deque(maxlen=10)
+
+        # Blocks longer than slow_threshold + ping_interval are always captured
+        self.ping_interval = min(0.01, slow_threshold / 4)
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.watchdog_thread: Optional[threading.Thread] = None
+        self.loop_thread_id: Optional[int] = None
+        self.stopping = threading.Event()
+
+    @classmethod
+    def from_env(cls) -> 'Diagnostics':
+        """Build from BOT_DIAGNOSTICS and BOT_SLOW_CALLBACK_MS"""
+        enabled = os.getenv('BOT_DIAGNOSTICS', '').lower() in ('1', 'true', 'yes')
+        if not enabled:
+            return cls(enabled=False)
+
+        slow_callback_ms = os.getenv('BOT_SLOW_CALLBACK_MS', '100')
+        try:
+            slow_threshold = float(slow_callback_ms) / 1000
+        except ValueError:
+            logger.warning(f"Invalid BOT_SLOW_CALLBACK_MS {slow_callback_ms!r}, using 100 ms")
+            slow_threshold = 0.1
+        return cls(enabled=True, slow_threshold=slow_threshold)
+
+    def start(self):
+        """Start the watchdog thread (must be called from the loop it monitors)"""
+        if not self.enabled or self.watchdog_thread:
+            return
+
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+
+        # A fresh event per thread, so a restart never revives a stopping watchdog
+        self.stopping = threading.Event()
+        self.watchdog_thread = threading.Thread(target=self.watchdog, args=(self.stopping,),
+                                                name='loop-watchdog', daemon=True)
+        self.watchdog_thread.start()
+        logger.info(f"Diagnostics enabled (slow callback threshold {self.slow_threshold * 1000:.0f} ms)")
+
+    def stop(self):
+        """Stop the watchdog thread"""
+        self.stopping.set()
+        self.watchdog_thread = None
+
+    def reset(self):
+        """Forget all collected measurements"""
+        self.lag_samples.clear()
+        self.handler_stats.clear()
+        self.slow_callbacks.clear()
+        self.loop_stalls.clear()
+
+    def timed(self, name: str):
+        """Decorator recording the duration of an async handler"""
+        def decorator(func):
+            if not self.enabled:
+                return func
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+
+            return wrapper
+        return decorator
+
+    def record(self, name: str, elapsed: float, slow_check: bool = True):
+        """Record one handler run; wall time includes awaited I/O"""
+        self.handler_stats.setdefault(name, HandlerStats()).add(elapsed)
+        if slow_check and elapsed >= self.slow_threshold:
+            self.slow_callbacks.append(SlowCallback(time.time(), name, elapsed, ''))
+
+    def watchdog(self, stopping: threading.Event):
+        """Ping the loop and snapshot its stack when a ping goes unanswered"""
+        window_start = time.monotonic()
+        window_max = 0.0
+
+        while not stopping.wait(self.ping_interval):
+            answered = threading.Event()
+            sent = time.monotonic()
+            try:
+                self.loop.call_soon_threadsafe(answered.set)
+            except RuntimeError:
+                # The loop has been closed
+                return
+
+            if not answered.wait(self.slow_threshold):
+                # Still blocked: capture whatever is running on the loop right now
+                frame = sys._current_frames().get(self.loop_thread_id)
+                stack = ''.join(traceback.format_stack(frame, limit=8)) if frame else ''
+
+                while not answered.wait(0.5):
+                    if stopping.is_set():
+                        return
+
+                blocked = time.monotonic() - sent
+                self.loop_stalls.append(SlowCallback(time.time(), 'event loop blocked', blocked, stack))
+                logger.warning(f"Event loop blocked for {blocked:.3f}s:\n{stack}")
+
+            # Keep the worst ping latency of each lag_interval as one lag sample
+            now = time.monotonic()
+            window_max = max(window_max, now - sent)
+            if now - window_start >= self.lag_interval:
+                self.lag_samples.append(window_max)
+                window_start = now
+                window_max = 0.0
+
+    def lag_summary(self) -> Optional[Tuple[float, float, float]]:
+        """Return (average, p95, max) loop lag in seconds"""
+        if not self.lag_samples:
+            return None
+        samples = sorted(self.lag_samples)
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        return (sum(samples) / len(samples), p95, samples[-1])
+
+
+def sample_profile(thread_id: int, duration: float, interval: float = 0.005) -> Tuple[int, List[Tuple[str, int]]]:
+    """
+    Sample the stack of one thread for duration seconds
+
+    Returns the number of samples and the most frequent innermost frames as
+    ("function (file:line)", count). Meant to run in a worker thread.
+    """
+    counts: Counter = Counter()
+    samples = 0
+    deadline = time.monotonic() + duration
+
+    while time.monotonic() < deadline:
+        frame = sys._current_frames().get(thread_id)
+        if frame is not None:
+            code = frame.f_code
+            counts[f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"] += 1
+            samples += 1
+        time.sleep(interval)
+
+    return samples, counts.most_common(10)
@@ -5,10 +5,16 @@ import discord
 from discord.ext import commands, tasks
 from dotenv import load_dotenv
 from aiohttp_sse_client import sse_client
-import json
 import logging
+import threading
 from typing import List, Optional
 
+from chat_filter import ChatFilter
+from diagnostics import Diagnostics, sample_profile
+from event_bus import subscribe
+from fanout import ChannelFanout
+from hermes_events import decode_chat_event, decode_player_event
+
 # Load environment variables
 load_dotenv()
 
@@ -19,43 +25,93 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Loop lag, handler timings and slow callbacks (BOT_DIAGNOSTICS=1), see !mcdebug
+diagnostics = Diagnostics.from_env()
+
 class MinecraftBot(commands.Bot):
     def __init__(self):
-        intents = discord.Intents.default()
-        intents.message_content = True
-        super().__init__(command_prefix='!mc', intents=intents)
+        self.low_memory = os.getenv('LOW_MEMORY_MODE', '').lower() in ('1', 'true', 'yes')
+        
+        if self.low_memory:
+            # The relay only reads messages in its linked channels: no message,
+            # member or presence caches and no member chunking at startup
+            intents = discord.Intents.none()
+            intents.guilds = True
+            intents.guild_messages = True
+            intents.message_content = True
+            super().__init__(
+                command_prefix='!mc',
+                intents=intents,
+                max_messages=None,
+                member_cache_flags=discord.MemberCacheFlags.none(),
+                chunk_guilds_at_startup=False
+            )
+        else:
+            intents = discord.Intents.default()
+            intents.message_content = True
+            super().__init__(command_prefix='!mc', intents=intents)
         
         # Configuration
         self.hermes_base_url = os.getenv('HERMES_API_BASE_URL', 'http://localhost:8080')
         self.hermes_api_key = os.getenv('HERMES_API_KEY', '')
         self.channel_id = int(os.getenv('DISCORD_CHANNEL_ID'))
         
+        # Every channel (in any guild) that mirrors the relay; the primary one first
+        self.channel_ids: List[int] = [self.channel_id]
+        for extra_id in os.getenv('DISCORD_EXTRA_CHANNEL_IDS', '').split(','):
+            if extra_id.strip() and int(extra_id) not in self.channel_ids:
+                self.channel_ids.append(int(extra_id))
+        
+        # Per-channel send queues shared by all relayed events
+        self.fanout = ChannelFanout(self.get_channel, diagnostics=diagnostics if diagnostics.enabled else None)
+        
+        # Multi-process mode: events come from hermes_worker.py over this socket
+        self.event_bus_path = os.getenv('HERMES_EVENT_BUS')
+        
+        # Optional moderation rules applied to both relay directions
+        chat_filter_file = os.getenv('CHAT_FILTER_FILE')
+        self.chat_filter: Optional[ChatFilter] = ChatFilter(chat_filter_file) if chat_filter_file else None
+        
         # HTTP session for API calls
         self.session: Optional[aiohttp.ClientSession] = None
         
         # SSE monitoring tasks
         self.player_events_task: Optional[asyncio.Task] = None
         self.chat_events_task: Optional[asyncio.Task] = None
+        self.event_bus_task: Optional[asyncio.Task] = None
         
     async def setup_hook(self):
         """Called when the bot is starting up"""
         # Create HTTP session
         self.session = aiohttp.ClientSession()
         
-        # Start monitoring join/leave events and chat messages
-        self.player_events_task = asyncio.create_task(self.monitor_player_events())
-        self.chat_events_task = asyncio.create_task(self.monitor_chat_messages())
+        diagnostics.start()
+        
+        if self.event_bus_path:
+            # The ingestion worker owns the Hermes streams, we only relay
+            self.event_bus_task = asyncio.create_task(self.consume_event_bus())
+        else:
+            # Start monitoring join/leave events and chat messages
+            self.player_events_task = asyncio.create_task(self.monitor_player_events())
+            self.chat_events_task = asyncio.create_task(self.monitor_chat_messages())
         
         logger.info("Bot setup completed")
     
     async def close(self):
         """Clean up when bot shuts down"""
+        diagnostics.stop()
+        
         if self.player_events_task:
             self.player_events_task.cancel()
         
         if self.chat_events_task:
             self.chat_events_task.cancel()
         
+        if self.event_bus_task:
+            self.event_bus_task.cancel()
+        
+        await self.fanout.close()
+        
         if self.session:
             await self.session.close()
         
@@ -64,16 +120,15 @@ class MinecraftBot(commands.Bot):
     async def on_ready(self):
         """Called when the bot has successfully connected to Discord"""
         logger.info(f'{self.user} has connected to Discord!')
+        if self.low_memory:
+            logger.info("Running in low-memory mode")
         
-        # Get the designated channel
-        channel = self.get_channel(self.channel_id)
-        if channel:
-            embed = discord.Embed(
-                title="🟢 Minecraft Bot Online",
-                description="Bot is now monitoring the Minecraft server!",
-                color=discord.Color.green()
-            )
-            await channel.send(embed=embed)
+        embed = discord.Embed(
+            title="🟢 Minecraft Bot Online",
+            description="Bot is now monitoring the Minecraft server!",
+            color=discord.Color.green()
+        )
+        self.fanout.send(self.channel_ids, embed)
     
     async def on_message(self, message):
         """Handle messages from Discord users"""
@@ -81,8 +136,8 @@ class MinecraftBot(commands.Bot):
         if message.author == self.user:
             return
         
-        # Only process messages from the designated channel
-        if message.channel.id != self.channel_id:
+        # Only process messages from the linked channels
+        if message.channel.id not in self.channel_ids:
             return
         
         # Process commands first
@@ -92,8 +147,19 @@ class MinecraftBot(commands.Bot):
         if not message.content.startswith(self.command_prefix):
             await self.forward_to_minecraft(message)
     
+    @diagnostics.timed('forward_to_minecraft')
     async def forward_to_minecraft(self, message):
         """Forward Discord message to Minecraft server via chat API"""
+        if self.chat_filter:
+            match = self.chat_filter.check(message.content)
+            if match:
+                logger.info(f"Blocked message from {message.author.display_name} ({match.category}: {match.pattern})")
+                try:
+                    await message.add_reaction("🚫")
+                except discord.errors.Forbidden:
+                    pass
+                return
+        
         try:
             headers = {'Content-Type': 'application/json'}
             if self.hermes_api_key:
@@ -118,6 +184,7 @@ class MinecraftBot(commands.Bot):
                     except discord.errors.Forbidden:
                         pass  # Bot doesn't have permission to add reactions
                     logger.info("Message successfully sent to Minecraft")
+                    self.mirror_to_linked_channels(message)
                 else:
                     try:
                         await message.add_reaction("❌")
@@ -132,16 +199,34 @@ class MinecraftBot(commands.Bot):
             except discord.errors.Forbidden:
                 pass
     
+    def mirror_to_linked_channels(self, message):
+        """Show a relayed Discord message once in every other linked channel"""
+        if len(self.channel_ids) < 2:
+            return
+        
+        # The Minecraft echo of this message is dropped as a [Discord] message,
+        # so this is the only copy the other channels receive
+        embed = discord.Embed(
+            description=f"**{message.author.display_name}:** {message.content}",
+            color=discord.Color.blurple()
+        )
+        embed.set_footer(text=f"Discord · {message.guild.name}" if message.guild else "Discord")
+        self.fanout.send(self.channel_ids, embed, exclude=message.channel.id)
+    
     async def forward_from_minecraft(self, player_name: str, chat_message: str):
         """Forward Minecraft chat message to Discord (placeholder for future chat API)"""
-        channel = self.get_channel(self.channel_id)
-        if channel:
-            embed = discord.Embed(
-                description=f"**{player_name}:** {chat_message}",
-                color=discord.Color.blue()
-            )
-            embed.set_footer(text="Minecraft Chat")
-            await channel.send(embed=embed)
+        if self.chat_filter:
+            match = self.chat_filter.check(chat_message)
+            if match:
+                logger.info(f"Blocked chat from {player_name} ({match.category}: {match.pattern})")
+                return
+        
+        embed = discord.Embed(
+            description=f"**{player_name}:** {chat_message}",
+            color=discord.Color.blue()
+        )
+        embed.set_footer(text="Minecraft Chat")
+        self.fanout.send(self.channel_ids, embed)
     
     async def get_player_count(self) -> Optional[int]:
         """Get the current number of online players"""
@@ -211,34 +296,16 @@ class MinecraftBot(commands.Bot):
                 logger.info("Retrying SSE connection in 30 seconds...")
                 await asyncio.sleep(30)
     
+    @diagnostics.timed('handle_player_event')
     async def handle_player_event(self, event_data: str):
         """Handle player join/leave events from SSE stream"""
         try:
-            channel = self.get_channel(self.channel_id)
-            if not channel:
-                return
-            
-            # Parse the event data
             event_text = event_data.strip()
             logger.info(f"Received player event: {event_text}")
             
-            if " has joined!" in event_text:
-                player_name = event_text.replace(" has joined!", "")
-                embed = discord.Embed(
-                    title="🟢 Player Joined",
-                    description=f"**{player_name}** joined the server",
-                    color=discord.Color.green()
-                )
-                await channel.send(embed=embed)
-                
-            elif " has left." in event_text:
-                player_name = event_text.replace(" has left.", "")
-                embed = discord.Embed(
-                    title="🔴 Player Left",
-                    description=f"**{player_name}** left the server",
-                    color=discord.Color.red()
-                )
-                await channel.send(embed=embed)
+            event = decode_player_event(event_text)
+            if event:
+                await self.relay_event(event)
                 
         except Exception as e:
             logger.error(f"Error handling player event: {e}")
@@ -266,42 +333,62 @@ class MinecraftBot(commands.Bot):
                 logger.info("Retrying chat SSE connection in 30 seconds...")
                 await asyncio.sleep(30)
     
+    @diagnostics.timed('handle_chat_event')
     async def handle_chat_event(self, event_data: str):
         """Handle chat messages from SSE stream"""
         try:
-            channel = self.get_channel(self.channel_id)
-            if not channel:
-                return
-            
-            # Parse the event data (expecting JSON format)
-            try:
-                chat_data = json.loads(event_data)
-                player_name = chat_data.get('player', 'Unknown')
-                message = chat_data.get('message', '')
-                
-                # Don't forward messages that came from Discord (to prevent loops)
-                if message and not player_name.startswith('[Discord]'):
-                    logger.info(f"Received chat from Minecraft: [{player_name}] {message}")
-                    await self.forward_from_minecraft(player_name, message)
-                    
-            except json.JSONDecodeError:
-                # If it's not JSON, try to parse as plain text format
-                # Expected format: "PlayerName: message content"
-                if ':' in event_data:
-                    parts = event_data.split(':', 1)
-                    player_name = parts[0].strip()
-                    message = parts[1].strip()
-                    
-                    # Don't forward messages that came from Discord (to prevent loops)
-                    if message and not player_name.startswith('[Discord]'):
-                        logger.info(f"Received chat from Minecraft: [{player_name}] {message}")
-                        await self.forward_from_minecraft(player_name, message)
+            event = decode_chat_event(event_data)
+            if event:
+                logger.info(f"Received chat from Minecraft: [{event['player']}] {event['message']}")
+                await self.relay_event(event)
                         
         except Exception as e:
             logger.error(f"Error handling chat event: {e}")
+    
+    async def consume_event_bus(self):
+        """Relay events published by the Hermes ingestion worker"""
+        while True:
+            try:
+                logger.info(f"Connecting to Hermes event bus at {self.event_bus_path}...")
+                
+                async for batch in subscribe(self.event_bus_path):
+                    for event in batch:
+                        try:
+                            await self.relay_event(event)
+                        except Exception as e:
+                            logger.error(f"Error relaying {event.get('type')} event: {e}")
+                            
+            except Exception as e:
+                logger.error(f"Event bus connection error: {e}")
+                logger.info("Retrying event bus connection in 5 seconds...")
+                await asyncio.sleep(5)
+    
+    @diagnostics.timed('relay_event')
+    async def relay_event(self, event: dict):
+        """Render a decoded Hermes event once and send it to every linked channel"""
+        if event['type'] == 'chat':
+            await self.forward_from_minecraft(event['player'], event['message'])
+            return
+        
+        if event['type'] == 'player_join':
+            embed = discord.Embed(
+                title="🟢 Player Joined",
+                description=f"**{event['player']}** joined the server",
+                color=discord.Color.green()
+            )
+            self.fanout.send(self.channel_ids, embed)
+            
+        elif event['type'] == 'player_leave':
+            embed = discord.Embed(
+                title="🔴 Player Left",
+                description=f"**{event['player']}** left the server",
+                color=discord.Color.red()
+            )
+            self.fanout.send(self.channel_ids, embed)
 
 # Bot commands
 @commands.command(name='players', aliases=['online', 'who'])
+@diagnostics.timed('players_command')
 async def players_command(ctx):
     """Display current online players"""
     bot = ctx.bot
@@ -348,6 +435,7 @@ async def players_command(ctx):
     await ctx.send(embed=embed)
 
 @commands.command(name='status', aliases=['server'])
+@diagnostics.timed('status_command')
 async def status_command(ctx):
     """Check server status and basic info"""
     bot = ctx.bot
@@ -402,12 +490,105 @@ async def status_command(ctx):
     
     await ctx.send(embed=embed)
 
+@commands.command(name='debug')
+@commands.has_permissions(administrator=True)
+async def debug_command(ctx, action: str = 'summary', seconds: float = 10.0):
+    """Show loop lag, handler timings and slow callbacks, or run a sampling profile"""
+    if action == 'profile':
+        # Sampling happens in a worker thread so the loop keeps running normally
+        seconds = min(max(seconds, 1.0), 60.0)
+        await ctx.send(f"⏱️ Profiling the event loop for {seconds:.0f} seconds...")
+        samples, top_frames = await asyncio.to_thread(sample_profile, threading.get_ident(), seconds)
+        
+        embed = discord.Embed(
+            title="🔬 Event Loop Profile",
+            description=f"{samples} samples over {seconds:.0f} seconds (innermost frames)",
+            color=discord.Color.blue()
+        )
+        lines = [f"{count * 100 / samples:5.1f}%  {frame}" for frame, count in top_frames] if samples else []
+        embed.add_field(
+            name="Top Frames",
+            value=f"```{chr(10).join(lines)[:1000]}```" if lines else "No samples collected",
+            inline=False
+        )
+        await ctx.send(embed=embed)
+        return
+    
+    if not diagnostics.enabled:
+        embed = discord.Embed(
+            title="🛠️ Diagnostics Disabled",
+            description="Set `BOT_DIAGNOSTICS=1` and restart the bot to collect timings. "
+                        "`!mcdebug profile` works without it.",
+            color=discord.Color.orange()
+        )
+        await ctx.send(embed=embed)
+        return
+    
+    if action == 'reset':
+        diagnostics.reset()
+        ctx.bot.fanout.dropped.clear()
+        await ctx.send("🧹 Diagnostics reset")
+        return
+    
+    embed = discord.Embed(
+        title="🛠️ Bot Diagnostics",
+        color=discord.Color.blue()
+    )
+    
+    lag = diagnostics.lag_summary()
+    embed.add_field(
+        name="Event Loop Lag",
+        value=f"avg {lag[0] * 1000:.1f} ms, p95 {lag[1] * 1000:.1f} ms, max {lag[2] * 1000:.1f} ms" if lag else "No samples yet",
+        inline=False
+    )
+    
+    if diagnostics.handler_stats:
+        # Per-channel sends are listed under Discord Channels below
+        handler_lines = [
+            f"{name}: {stats.count}x, avg {stats.average * 1000:.1f} ms, max {stats.max * 1000:.1f} ms"
+            for name, stats in sorted(diagnostics.handler_stats.items())
+            if not name.startswith('discord_send:')
+        ]
+        handlers_value = "\n".join(handler_lines)[:1024]
+    else:
+        handlers_value = "No handler calls yet"
+    embed.add_field(name="Handlers", value=handlers_value, inline=False)
+    
+    channel_lines = []
+    for channel_id in ctx.bot.channel_ids:
+        line = (f"<#{channel_id}>: queued {ctx.bot.fanout.queue_depth(channel_id)}, "
+                f"dropped {ctx.bot.fanout.dropped.get(channel_id, 0)}")
+        send_stats = diagnostics.handler_stats.get(f'discord_send:{channel_id}')
+        if send_stats:
+            line += f", send avg {send_stats.average * 1000:.1f} ms, max {send_stats.max * 1000:.1f} ms"
+        channel_lines.append(line)
+    embed.add_field(name="Discord Channels", value="\n".join(channel_lines)[:1024], inline=False)
+    
+    if diagnostics.slow_callbacks:
+        slow = diagnostics.slow_callbacks[-1]
+        slow_value = f"{len(diagnostics.slow_callbacks)} recorded, latest: {slow.source} took {slow.duration * 1000:.0f} ms"
+    else:
+        slow_value = f"None above {diagnostics.slow_threshold * 1000:.0f} ms"
+    embed.add_field(name="Slow Handlers", value=slow_value, inline=False)
+    
+    if diagnostics.loop_stalls:
+        stall = diagnostics.loop_stalls[-1]
+        stall_value = f"{len(diagnostics.loop_stalls)} recorded, latest blocked the loop for {stall.duration * 1000:.0f} ms"
+        if stall.stack:
+            stall_value += f"\n```{stall.stack[-900:]}```"
+    else:
+        stall_value = f"None above {diagnostics.slow_threshold * 1000:.0f} ms"
+    embed.add_field(name="Loop Stalls", value=stall_value[:1024], inline=False)
+    
+    await ctx.send(embed=embed)
+
 # Add commands to the bot
 async def main():
     """Main function to run the bot"""
     bot = MinecraftBot()
     bot.add_command(players_command)
     bot.add_command(status_command)
+    bot.add_command(debug_command)
     
     # Get Discord bot token
     token = os.getenv('DISCORD_BOT_TOKEN')
@@ -0,0 +1,176 @@
+"""
+Local event bus between the Hermes ingestion worker and the Discord gateway
+
+The worker publishes decoded relay events on a Unix socket and any number of
+gateway processes subscribe to it. Events are batched: each line on the socket
+is a JSON array of events, so a burst of SSE events costs one write and one
+read instead of one per event. Events published while no gateway is connected
+are buffered (up to a limit) and delivered on the next connection.
+"""
+
+import os
+import json
+import stat
+import asyncio
+import logging
+from collections import deque
+from itertools import islice
+from typing import AsyncIterator, Deque, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUS_PATH = '/tmp/mercury-hermes.sock'
+
+# Largest line a subscriber will accept (one batch of events)
+MAX_BATCH_BYTES = 4 * 1024 * 1024
+
+# Log backlog drops once, then every this many drops
+DROP_LOG_INTERVAL = 100
+
+# Only the user running the worker and bot may connect and read the chat feed
+SOCKET_MODE = 0o600
+
+
+class EventBusPublisher:
+    def __init__(self, path: str = DEFAULT_BUS_PATH, batch_size: int = 50,
+                 flush_interval: float = 0.05, backlog: int = 1000, drain_timeout: float = 5.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        # A subscriber that cannot take a batch within this time is dropped
+        self.drain_timeout = drain_timeout
+
+        # Events waiting to be flushed; oldest are dropped once the backlog is full
+        self.pending: Deque[dict] = deque(maxlen=backlog)
+        self.dropped = 0
+        self.writers: Set[asyncio.StreamWriter] = set()
+
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.flush_task: Optional[asyncio.Task] = None
+        self.wakeup = asyncio.Event()
+
+    async def start(self):
+        """Bind the Unix socket and start flushing batches"""
+        if os.path.exists(self.path):
+            if not stat.S_ISSOCK(os.stat(self.path).st_mode):
+                raise RuntimeError(f"Event bus path {self.path} exists and is not a socket")
+            try:
+                _, writer = await asyncio.open_unix_connection(self.path)
+            except OSError:
+                # Left behind by a worker that did not shut down cleanly
+                os.unlink(self.path)
+            else:
+                writer.close()
+                raise RuntimeError(f"Another worker is already serving the event bus at {self.path}")
+
+        self.server = await asyncio.start_unix_server(self.handle_subscriber, path=self.path)
+        os.chmod(self.path, SOCKET_MODE)
+        self.flush_task = asyncio.create_task(self.flush_loop())
+        logger.info(f"Event bus listening on {self.path}")
+
+    async def close(self):
+        """Flush what is left and stop serving"""
+        if self.flush_task:
+            self.flush_task.cancel()
+
+        if self.writers:
+            await self.flush()
+
+        for writer in list(self.writers):
+            writer.close()
+        self.writers.clear()
+
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def publish(self, event: dict):
+        """Queue an event for the next batch"""
+        if len(self.pending) == self.pending.maxlen:
+            self.dropped += 1
+            if self.dropped % DROP_LOG_INTERVAL == 1:
+                logger.warning(f"Event bus backlog full, dropping oldest events ({self.dropped} so far)")
+        self.pending.append(event)
+        if len(self.pending) >= self.batch_size:
+            self.wakeup.set()
+
+    async def handle_subscriber(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Keep a gateway connection registered until it disconnects"""
+        self.writers.add(writer)
+        logger.info(f"Gateway subscribed to event bus ({len(self.writers)} connected, "
+                    f"{self.dropped} events dropped from the backlog so far)")
+
+        # Deliver anything buffered while no gateway was connected
+        self.wakeup.set()
+
+        try:
+            # Subscribers never send anything, EOF means they went away
+            await reader.read()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.writers.discard(writer)
+            writer.close()
+            logger.info(f"Gateway left event bus ({len(self.writers)} connected)")
+
+    async def flush_loop(self):
+        """Flush pending events every flush_interval, or sooner when a batch fills up"""
+        while True:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+
+            if self.pending and self.writers:
+                await self.flush()
+
+    async def flush(self):
+        """Send all pending events to every subscriber"""
+        while self.pending and self.writers:
+            count = min(self.batch_size, len(self.pending))
+            line = (json.dumps(list(islice(self.pending, count))) + '\n').encode()
+
+            # Subscribers are written concurrently so a stuck one only costs drain_timeout
+            dropped_before = self.dropped
+            results = await asyncio.gather(*(self.send(writer, line) for writer in list(self.writers)))
+
+            # Events stay buffered until at least one subscriber has taken them
+            if not any(results):
+                break
+
+            # Events published during the write may have pushed some of this batch out already
+            for _ in range(max(0, count - (self.dropped - dropped_before))):
+                self.pending.popleft()
+
+    async def send(self, writer: asyncio.StreamWriter, line: bytes) -> bool:
+        """Write one batch to a subscriber, dropping it if it fails or falls behind"""
+        try:
+            writer.write(line)
+            await asyncio.wait_for(writer.drain(), timeout=self.drain_timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(f"Dropping event bus subscriber: not reading for {self.drain_timeout:g}s")
+        except (ConnectionError, OSError) as e:
+            logger.warning(f"Dropping event bus subscriber: {e}")
+
+        self.writers.discard(writer)
+        writer.close()
+        return False
+
+
+async def subscribe(path: str = DEFAULT_BUS_PATH) -> AsyncIterator[List[dict]]:
+    """Yield batches of events from the worker until the connection drops"""
+    reader, writer = await asyncio.open_unix_connection(path, limit=MAX_BATCH_BYTES)
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("Event bus closed by worker")
+            yield json.loads(line)
+    finally:
+        writer.close()
@@ -0,0 +1,90 @@
+"""
+Fan-out of rendered embeds to many Discord channels
+
+Each target channel gets its own queue and sender task. Discord rate-limits
+message sends per channel, so a channel that is waiting out a rate limit (or
+whose guild is slow) only delays its own queue, never the other channels.
+The same Embed object is shared by every channel it is sent to.
+
+When diagnostics are passed in, every send is timed as "discord_send" and
+"discord_send:<channel id>"; only the former can be listed as a slow handler. Queue depth and dropped messages are always
+tracked per channel.
+"""
+
+import time
+import asyncio
+import logging
+from typing import Callable, Dict, Iterable, Optional
+
+import discord
+
+from diagnostics import Diagnostics
+
+logger = logging.getLogger(__name__)
+
+
+class ChannelFanout:
+    def __init__(self, resolve_channel: Callable[[int], Optional[discord.abc.Messageable]],
+                 queue_size: int = 100, diagnostics: Optional[Diagnostics] = None):
+        self.resolve_channel = resolve_channel
+        self.queue_size = queue_size
+        self.diagnostics = diagnostics
+
+        self.queues: Dict[int, asyncio.Queue] = {}
+        self.tasks: Dict[int, asyncio.Task] = {}
+        self.dropped: Dict[int, int] = {}
+
+    def send(self, channel_ids: Iterable[int], embed: discord.Embed, exclude: Optional[int] = None):
+        """Schedule an embed for every channel except exclude; returns immediately"""
+        for channel_id in channel_ids:
+            if channel_id == exclude:
+                continue
+
+            queue = self.queues.get(channel_id)
+            if queue is None:
+                queue = self.queues[channel_id] = asyncio.Queue(maxsize=self.queue_size)
+                self.tasks[channel_id] = asyncio.create_task(self.sender(channel_id, queue))
+
+            if queue.full():
+                # Keep the feed current rather than replaying a stale backlog
+                queue.get_nowait()
+                self.dropped[channel_id] = self.dropped.get(channel_id, 0) + 1
+                logger.warning(f"Send queue for channel {channel_id} is full, dropping oldest message")
+            queue.put_nowait(embed)
+
+    async def sender(self, channel_id: int, queue: asyncio.Queue):
+        """Deliver queued embeds to one channel in order"""
+        while True:
+            embed = await queue.get()
+
+            channel = self.resolve_channel(channel_id)
+            if not channel:
+                self.dropped[channel_id] = self.dropped.get(channel_id, 0) + 1
+                logger.warning(f"Channel {channel_id} not found, dropping message")
+                continue
+
+            start = time.perf_counter()
+            try:
+                await channel.send(embed=embed)
+            except Exception as e:
+                logger.error(f"Failed to send to channel {channel_id}: {e}")
+
+            if self.diagnostics:
+                # Includes time spent waiting out Discord rate limits for this channel.
+                # Only the aggregate entry can be listed as a slow handler
+                elapsed = time.perf_counter() - start
+                self.diagnostics.record('discord_send', elapsed)
+                self.diagnostics.record(f'discord_send:{channel_id}', elapsed, slow_check=False)
+
+    def queue_depth(self, channel_id: int) -> int:
+        """Number of embeds waiting to be sent to a channel"""
+        queue = self.queues.get(channel_id)
+        return queue.qsize() if queue else 0
+
+    async def close(self):
+        """Stop all sender tasks"""
+        for task in self.tasks.values():
+            task.cancel()
+        await asyncio.gather(*self.tasks.values(), return_exceptions=True)
+        self.tasks.clear()
+        self.queues.clear()
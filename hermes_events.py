@@ -0,0 +1,46 @@
+"""
+Decoding of HermesAPI stream events into relay events
+
+Relay events are plain dicts so they can be passed between processes:
+    {'type': 'player_join', 'player': 'Steve'}
+    {'type': 'player_leave', 'player': 'Steve'}
+    {'type': 'chat', 'player': 'Steve', 'message': 'hello'}
+"""
+
+import json
+from typing import Optional
+
+
+def decode_player_event(event_data: str) -> Optional[dict]:
+    """Decode a line from the /players/connections stream"""
+    event_text = event_data.strip()
+
+    if " has joined!" in event_text:
+        return {'type': 'player_join', 'player': event_text.replace(" has joined!", "")}
+
+    if " has left." in event_text:
+        return {'type': 'player_leave', 'player': event_text.replace(" has left.", "")}
+
+    return None
+
+
+def decode_chat_event(event_data: str) -> Optional[dict]:
+    """Decode a message from the /chat/stream stream (JSON or "Player: message")"""
+    try:
+        chat_data = json.loads(event_data)
+        player_name = chat_data.get('player', 'Unknown')
+        message = chat_data.get('message', '')
+    except json.JSONDecodeError:
+        # If it's not JSON, try to parse as plain text format
+        # Expected format: "PlayerName: message content"
+        if ':' not in event_data:
+            return None
+        parts = event_data.split(':', 1)
+        player_name = parts[0].strip()
+        message = parts[1].strip()
+
+    # Don't forward messages that came from Discord (to prevent loops)
+    if not message or player_name.startswith('[Discord]'):
+        return None
+
+    return {'type': 'chat', 'player': player_name, 'message': message}
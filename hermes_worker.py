@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Hermes ingestion worker for the multi-process mode
+
+Owns the HermesAPI SSE streams, decodes their events and publishes them on the
+local event bus. Run it alongside the bot with HERMES_EVENT_BUS set to the same
+socket path in both processes; either side can be restarted on its own.
+"""
+
+import os
+import asyncio
+import logging
+from typing import Callable, Optional
+
+from dotenv import load_dotenv
+from aiohttp_sse_client import sse_client
+
+from event_bus import DEFAULT_BUS_PATH, EventBusPublisher
+from hermes_events import decode_chat_event, decode_player_event
+
+logger = logging.getLogger(__name__)
+
+
+class HermesWorker:
+    def __init__(self, bus_path: str):
+        # Configuration
+        self.hermes_base_url = os.getenv('HERMES_API_BASE_URL', 'http://localhost:8080')
+        self.hermes_api_key = os.getenv('HERMES_API_KEY', '')
+
+        self.bus = EventBusPublisher(bus_path)
+
+    async def run(self):
+        """Serve the event bus and follow both Hermes streams"""
+        await self.bus.start()
+        try:
+            await asyncio.gather(
+                self.monitor_stream('/players/connections', decode_player_event, 'player events'),
+                self.monitor_stream('/chat/stream', decode_chat_event, 'chat messages'),
+            )
+        finally:
+            await self.bus.close()
+
+    async def monitor_stream(self, path: str, decode: Callable[[str], Optional[dict]], label: str):
+        """Decode events from one SSE stream and publish them on the bus"""
+        while True:
+            try:
+                headers = {}
+                if self.hermes_api_key:
+                    headers['Authorization'] = f'Bearer {self.hermes_api_key}'
+
+                logger.info(f"Connecting to SSE stream for {label}...")
+
+                async with sse_client.EventSource(
+                    f"{self.hermes_base_url}{path}",
+                    headers=headers
+                ) as event_source:
+                    async for event in event_source:
+                        if not event.data:
+                            continue
+
+                        try:
+                            decoded = decode(event.data)
+                        except Exception as e:
+                            logger.error(f"Error decoding {label}: {e}")
+                            continue
+
+                        if decoded:
+                            logger.info(f"Publishing {decoded['type']} event for {decoded['player']}")
+                            self.bus.publish(decoded)
+
+            except Exception as e:
+                logger.error(f"SSE connection error ({label}): {e}")
+                logger.info(f"Retrying SSE connection for {label} in 30 seconds...")
+                await asyncio.sleep(30)
+
+
+async def main():
+    """Main function to run the ingestion worker"""
+    load_dotenv()
+
+    worker = HermesWorker(os.getenv('HERMES_EVENT_BUS') or DEFAULT_BUS_PATH)
+    try:
+        await worker.run()
+    except RuntimeError as e:
+        logger.error(str(e))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    try:
+        exit(asyncio.run(main()))
+    except KeyboardInterrupt:
+        logger.info("Worker interrupted by user")
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for the Minecraft Discord Bot
+
+Runs the bot once in the default mode and once with LOW_MEMORY_MODE=1,
+sampling the resident memory (RSS) of each run, then prints both series and
+a summary. Uses the real .env configuration, so the bot connects to Discord
+and HermesAPI like it normally would. Linux only (reads /proc).
+
+The bot's output for each run goes to memory_benchmark_default.log and
+memory_benchmark_low.log; if the bot exits early the end of the log is shown.
+
+Usage:
+    python memory_benchmark.py --duration 3600 --interval 60
+"""
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+def read_rss_kib(pid):
+    """Return the resident set size of a process in KiB"""
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+def print_log_tail(log_path, lines=15):
+    """Show the end of the bot's log so an early exit can be diagnosed"""
+    with open(log_path, errors='replace') as f:
+        tail = f.readlines()[-lines:]
+    print(f"   Last lines of {log_path}:")
+    for line in tail:
+        print(f"   | {line.rstrip()}")
+
+def run_bot(low_memory, duration, interval):
+    """
+    Run the bot for duration seconds
+
+    Returns the (elapsed, rss_kib) samples and whether the bot ran for the
+    whole duration.
+    """
+    env = dict(os.environ, LOW_MEMORY_MODE='1' if low_memory else '0')
+    log_path = f"memory_benchmark_{'low' if low_memory else 'default'}.log"
+    log_file = open(log_path, 'w')
+    process = subprocess.Popen(
+        [sys.executable, 'discord_bot.py'],
+        env=env,
+        stdout=log_file,
+        stderr=subprocess.STDOUT
+    )
+
+    samples = []
+    completed = True
+    start = time.monotonic()
+    try:
+        while time.monotonic() - start < duration:
+            time.sleep(interval)
+            rss = None
+            if process.poll() is None:
+                try:
+                    rss = read_rss_kib(process.pid)
+                except FileNotFoundError:
+                    # The bot exited between poll() and reading /proc
+                    pass
+
+            if rss is None:
+                process.wait()
+                print(f"❌ Bot exited early with code {process.returncode}")
+                log_file.flush()
+                print_log_tail(log_path)
+                completed = False
+                break
+            samples.append((time.monotonic() - start, rss))
+            print(f"   {samples[-1][0]:8.0f} s  {samples[-1][1] / 1024:8.1f} MiB")
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        log_file.close()
+
+    return samples, completed
+
+def summarize(samples):
+    """Return (first, peak, last) RSS in MiB"""
+    if not samples:
+        return (0.0, 0.0, 0.0)
+    values = [rss / 1024 for _, rss in samples]
+    return (values[0], max(values), values[-1])
+
+def main():
+    """Main benchmark function"""
+    parser = argparse.ArgumentParser(description="Compare bot RSS with and without LOW_MEMORY_MODE")
+    parser.add_argument('--duration', type=float, default=1800, help="seconds to run each mode")
+    parser.add_argument('--interval', type=float, default=30, help="seconds between samples")
+    args = parser.parse_args()
+
+    if not os.path.exists('/proc/self/status'):
+        print("❌ This benchmark needs /proc (Linux)")
+        return 1
+
+    results = {}
+    all_completed = True
+    for label, low_memory in (('default', False), ('low-memory', True)):
+        print(f"\n📊 Running bot in {label} mode for {args.duration:.0f} s...")
+        samples, completed = run_bot(low_memory, args.duration, args.interval)
+        results[label] = (summarize(samples), completed)
+        all_completed = all_completed and completed and bool(samples)
+
+    print("\n🎯 RSS Summary (MiB):")
+    print(f"   {'Mode':<12} {'First':>8} {'Peak':>8} {'Last':>8}")
+    for label, ((first, peak, last), completed) in results.items():
+        note = "" if completed else "  (exited early)"
+        print(f"   {label:<12} {first:8.1f} {peak:8.1f} {last:8.1f}{note}")
+
+    if not all_completed:
+        print("\n⚠️  At least one run exited early, so the comparison is not valid")
+        return 1
+
+    default_last = results['default'][0][2]
+    saved = default_last - results['low-memory'][0][2]
+    print(f"\n💾 Low-memory mode saved {saved:.1f} MiB ({saved / default_last:.0%}) at the end of the run")
+
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
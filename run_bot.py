@@ -5,14 +5,49 @@ Simple launcher script for the Minecraft Discord Bot
 
 import sys
 import os
+import json
+import time
+import hashlib
+import argparse
 import subprocess
+import importlib.util
+from contextlib import contextmanager
+
+REQUIRED_FILES = ['discord_bot.py', 'requirements.txt', '.env']
+REQUIRED_VARS = ['DISCORD_BOT_TOKEN', 'DISCORD_CHANNEL_ID']
+REQUIRED_MODULES = ['discord', 'aiohttp', 'aiohttp_sse_client']
+HASHED_FILES = ['requirements.txt', '.env']
+
+# Result of the last successful preflight, keyed on requirements/.env hashes
+PREFLIGHT_CACHE = '.preflight_cache.json'
+
+class StartupTimer:
+    """Collects how long each launcher phase takes"""
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = []
+    
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+    
+    def report(self):
+        """Print the startup timing report"""
+        print("⏱️  Startup timing:")
+        for name, elapsed in self.phases:
+            print(f"   {name:<24} {elapsed * 1000:8.1f} ms")
+        total = time.perf_counter() - self.started
+        print(f"   {'Total':<24} {total * 1000:8.1f} ms")
 
 def check_requirements():
     """Check if all required files and environment variables are present"""
-    required_files = ['discord_bot.py', 'requirements.txt', '.env']
     missing_files = []
     
-    for file in required_files:
+    for file in REQUIRED_FILES:
         if not os.path.exists(file):
             missing_files.append(file)
     
@@ -31,10 +66,9 @@ def check_requirements():
         from dotenv import load_dotenv
         load_dotenv()
         
-        required_vars = ['DISCORD_BOT_TOKEN', 'DISCORD_CHANNEL_ID']
         missing_vars = []
         
-        for var in required_vars:
+        for var in REQUIRED_VARS:
             if not os.getenv(var):
                 missing_vars.append(var)
         
@@ -53,24 +87,68 @@ def check_requirements():
 
 def install_requirements():
     """Install requirements if needed"""
-    try:
-        import discord
-        import aiohttp
-        from aiohttp_sse_client import sse_client
+    # Locate the packages without importing them; the bot imports them later anyway
+    missing_modules = [name for name in REQUIRED_MODULES if importlib.util.find_spec(name) is None]
+    
+    if not missing_modules:
         print("✅ All requirements are installed")
         return True
-    except ImportError:
-        print("📦 Installing requirements...")
+    
+    print(f"📦 Installing requirements (missing: {', '.join(missing_modules)})...")
+    try:
+        subprocess.check_call([sys.executable, '-m', 'pip', 'install', '-r', 'requirements.txt'])
+        print("✅ Requirements installed successfully")
+        return True
+    except subprocess.CalledProcessError:
+        print("❌ Failed to install requirements")
+        return False
+
+def preflight_key():
+    """Hash everything the preflight result depends on, or None if a file is missing"""
+    digest = hashlib.sha256()
+    digest.update(f"{sys.executable}\n{sys.version}\n".encode())
+    
+    for file in HASHED_FILES:
         try:
-            subprocess.check_call([sys.executable, '-m', 'pip', 'install', '-r', 'requirements.txt'])
-            print("✅ Requirements installed successfully")
-            return True
-        except subprocess.CalledProcessError:
-            print("❌ Failed to install requirements")
-            return False
+            with open(file, 'rb') as f:
+                digest.update(f.read())
+        except OSError:
+            return None
+    
+    # Variables set outside .env (e.g. by a supervisor) also satisfy the check
+    for var in REQUIRED_VARS:
+        digest.update(f"{var}={bool(os.environ.get(var))}\n".encode())
+    
+    return digest.hexdigest()
+
+def load_preflight_cache():
+    """Return the key of the last successful preflight"""
+    try:
+        with open(PREFLIGHT_CACHE) as f:
+            return json.load(f).get('key')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def save_preflight_cache(key):
+    """Remember a successful preflight so the next launch can skip it"""
+    try:
+        with open(PREFLIGHT_CACHE, 'w') as f:
+            json.dump({'key': key, 'checked_at': time.time()}, f)
+    except OSError as e:
+        print(f"⚠️  Could not write preflight cache: {e}")
+
+def parse_args():
+    """Parse launcher command line options"""
+    parser = argparse.ArgumentParser(description="Minecraft Discord Bot launcher")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="ignore the cached preflight result and re-check everything")
+    return parser.parse_args()
 
 def main():
     """Main launcher function"""
+    args = parse_args()
+    timer = StartupTimer()
+    
     print("🚀 Minecraft Discord Bot Launcher")
     print("=" * 40)
     
@@ -81,21 +159,43 @@ def main():
     
     print(f"✅ Python {sys.version.split()[0]}")
     
-    # Check requirements
-    if not check_requirements():
-        return 1
+    with timer.phase("Preflight cache lookup"):
+        key = preflight_key()
+        cached = key is not None and not args.no_cache and load_preflight_cache() == key
+    
+    if cached:
+        print("✅ Preflight cached (requirements and .env unchanged)")
+    else:
+        # Check requirements
+        with timer.phase("Configuration check"):
+            if not check_requirements():
+                return 1
+        
+        # Install dependencies if needed
+        with timer.phase("Dependency check"):
+            if not install_requirements():
+                return 1
+        
+        if key is not None:
+            save_preflight_cache(key)
     
-    # Install dependencies if needed
-    if not install_requirements():
+    try:
+        with timer.phase("Import discord_bot"):
+            import discord_bot
+    except Exception as e:
+        print(f"\n❌ Failed to load bot: {e}")
+        if cached:
+            print("💡 The preflight was skipped from cache, retry with: python run_bot.py --no-cache")
         return 1
     
+    timer.report()
+    
     # Run the bot
     print("\n🤖 Starting Discord bot...")
     print("Press Ctrl+C to stop the bot")
     print("-" * 40)
     
     try:
-        import discord_bot
         discord_bot.asyncio.run(discord_bot.main())
     except KeyboardInterrupt:
         print("\n👋 Bot stopped by user")